@@ -236,7 +236,7 @@ class Cell(object):
     @property
     def pivot_table(self):
         """Get Set the pivot table anchored at this cell"""
-        if self._pivot_table == None:
+        if not self._pivot_table:
             return None
 
         return PivotTable.from_json(self._worksheet, self._pivot_table)
@@ -245,8 +245,9 @@ class Cell(object):
     def pivot_table(self, value: PivotTable | None):
         if value == None:
             self._pivot_table = None
+            return
 
-        self._pivot_table = value.get_json()
+        self._pivot_table = dict(value.to_json())
 
     def set_text_format(self, attribute, value):
         """
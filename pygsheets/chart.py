@@ -1,8 +1,39 @@
+from contextlib import contextmanager
+from itertools import chain
+import time
+
+from googleapiclient.errors import HttpError
+
 from pygsheets.utils import format_addr
 from pygsheets.cell import Cell
 from pygsheets.custom_types import ChartType
 from pygsheets.exceptions import InvalidArgumentValue
 
+# layout of the chart spec built by Chart.get_json
+_SPEC_TEMPLATE = {
+    'title': None,
+    'basicChart': {'chartType': None, 'legendPosition': None, 'domains': None, 'series': None},
+    'titleTextFormat': {'fontFamily': None},
+    'fontName': None,
+}
+
+_CHART_TYPE_MAP = ChartType._value2member_map_
+
+# attributes restored by Chart.batch when its update fails
+_BATCH_STATE = ('_title', '_chart_type', '_domain', '_ranges', '_anchor_cell', '_title_font_family', '_font_name',
+                '_legend_position')
+
+
+def _chart_data_sources(chart_data_list, key):
+    """Returns the source gridranges of a list of ChartDomain or ChartSeries json objects."""
+    return list(chain.from_iterable(
+        ((data.get(key) or {}).get('sourceRange') or {}).get('sources') or [] for data in chart_data_list))
+
+
+def _source_to_range(source):
+    return [(source.get('startRowIndex', 0)+1, source.get('startColumnIndex', 0)+1),
+            (source.get('endRowIndex', 0), source.get('endColumnIndex', 0))]
+
 
 class Chart(object):
     """
@@ -16,6 +47,15 @@ class Chart(object):
     :param anchor_cell:     Position of the left corner of the chart in the form of cell address or cell object
     :param json_obj:      Represents a json structure of the chart as given in `api <https://developers.google.com/sheets/api/reference/rest/v4/spreadsheets#BasicChartSpec>`__.
     """
+
+    __slots__ = ('_worksheet', '_chart_id', '_title', '_chart_type', '_domain', '_ranges', '_anchor_cell',
+                 '_title_font_family', '_font_name', '_legend_position', '_pending_requests', '_batching',
+                 '_dirty_fields', '_gridrange_cache', '_anchor_cell_cache', '_json_cache')
+
+    #: Seconds for which the charts fetched by :meth:`refresh` are reused by the other charts of the worksheet.
+    #: Set it on the class, or pass ``max_age`` to :meth:`refresh` for a single call.
+    refresh_ttl = 1.0
+
     def __init__(self, worksheet, domain=None, ranges=None, chart_type=None, title='', anchor_cell=None, json_obj=None):
         self._title = title
         self._chart_type = chart_type
@@ -24,14 +64,19 @@ class Chart(object):
             self._domain = (format_addr(domain[0], 'tuple'), format_addr(domain[1], 'tuple'))
         self._ranges = []
         if ranges:
-            for i in range(len(ranges)):
-                self._ranges.append((format_addr(ranges[i][0], 'tuple'), format_addr(ranges[i][1], 'tuple')))
+            self._ranges = [(format_addr(start, 'tuple'), format_addr(end, 'tuple')) for start, end in ranges]
         self._worksheet = worksheet
         self._title_font_family = 'Roboto'
         self._font_name = 'Roboto'
         self._legend_position = 'RIGHT_LEGEND'
         self._chart_id = None
         self._anchor_cell = anchor_cell
+        self._anchor_cell_cache = None
+        self._pending_requests = []
+        self._batching = False
+        self._dirty_fields = set()
+        self._gridrange_cache = {}
+        self._json_cache = None
         if json_obj is None:
             self._create_chart()
         else:
@@ -39,17 +84,14 @@ class Chart(object):
 
     @property
     def title(self):
-        """Title of the chart"""
+        """Title of the chart. Changing it is only sent to the sheet on the next update (see :meth:`flush`)."""
         return self._title
 
     @title.setter
     def title(self, new_title):
-        temp = self._title
         self._title = new_title
-        try:
-            self.update_chart()
-        except:
-            self._title = temp
+        self._dirty_fields.add('title')
+        self._json_cache = None
 
     @property
     def domain(self):
@@ -64,13 +106,19 @@ class Chart(object):
 
     @domain.setter
     def domain(self, new_domain):
+        self._check_chart_type()
         new_domain = (format_addr(new_domain[0], 'tuple'), format_addr(new_domain[1], 'tuple'))
         temp = self._domain
         self._domain = new_domain
+        self._gridrange_cache.clear()
+        self._anchor_cell_cache = None
+        self._json_cache = None
         try:
             self.update_chart()
-        except:
+        except HttpError:
             self._domain = temp
+            self._anchor_cell_cache = None
+            self._json_cache = None
 
     @property
     def chart_type(self):
@@ -78,6 +126,7 @@ class Chart(object):
         The specificed as enum of type :class:'ChartType'
 
         The available chart types are given in the `api docs <https://developers.google.com/sheets/api/reference/rest/v4/spreadsheets#BasicChartType>`__ .
+        It is None for charts which are not basic charts. Those can only be updated after setting a chart type.
         """
         return self._chart_type
 
@@ -87,10 +136,12 @@ class Chart(object):
             raise InvalidArgumentValue
         temp = self._chart_type
         self._chart_type = new_chart_type
+        self._json_cache = None
         try:
             self.update_chart()
-        except:
+        except HttpError:
             self._chart_type = temp
+            self._json_cache = None
 
     @property
     def ranges(self):
@@ -107,67 +158,64 @@ class Chart(object):
 
     @ranges.setter
     def ranges(self, new_ranges):
+        self._check_chart_type()
         if type(new_ranges) is tuple:
             new_ranges = [new_ranges]
 
-        for i in range(len(new_ranges)):
-            new_ranges[i] = (format_addr(new_ranges[i][0], 'tuple'), format_addr(new_ranges[i][1], 'tuple'))
+        new_ranges = [(format_addr(start, 'tuple'), format_addr(end, 'tuple')) for start, end in new_ranges]
 
         temp = self._ranges
         self._ranges = new_ranges
+        self._gridrange_cache.clear()
+        self._json_cache = None
         try:
             self.update_chart()
-        except:
+        except HttpError:
             self._ranges = temp
+            self._json_cache = None
 
     @property
     def title_font_family(self):
         """
         Font family of the title. (Default: 'Roboto')
+        Changing it is only sent to the sheet on the next update (see :meth:`flush`).
         """
         return self._title_font_family
 
     @title_font_family.setter
     def title_font_family(self, new_title_font_family):
-        temp = self._title_font_family
         self._title_font_family = new_title_font_family
-        try:
-            self.update_chart()
-        except:
-            self._title_font_family = temp
+        self._dirty_fields.add('title_font_family')
+        self._json_cache = None
 
     @property
     def font_name(self):
         """
         Font name for the chart. (Default: 'Roboto')
+        Changing it is only sent to the sheet on the next update (see :meth:`flush`).
         """
         return self._font_name
 
     @font_name.setter
     def font_name(self, new_font_name):
-        temp = self._font_name
         self._font_name = new_font_name
-        try:
-            self.update_chart()
-        except:
-            self._font_name = temp
+        self._dirty_fields.add('font_name')
+        self._json_cache = None
 
     @property
     def legend_position(self):
         """
         Legend postion of the chart. (Default: 'RIGHT_LEGEND')
         The available options are given in the `api docs <https://developers.google.com/sheets/api/reference/rest/v4/spreadsheets#BasicChartLegendPosition>`__.
+        Changing it is only sent to the sheet on the next update (see :meth:`flush`).
         """
         return self._legend_position
 
     @legend_position.setter
     def legend_position(self, new_legend_position):
-        temp = self._legend_position
         self._legend_position = new_legend_position
-        try:
-            self.update_chart()
-        except:
-            self._legend_position = temp
+        self._dirty_fields.add('legend_position')
+        self._json_cache = None
 
     @property
     def id(self):
@@ -183,16 +231,20 @@ class Chart(object):
 
     @anchor_cell.setter
     def anchor_cell(self, new_anchor_cell):
+        if type(new_anchor_cell) is Cell:
+            new_anchor_cell = (new_anchor_cell.row, new_anchor_cell.col)
+        else:
+            new_anchor_cell = format_addr(new_anchor_cell, 'tuple')
+        if new_anchor_cell == self._anchor_cell:
+            return
         temp = self._anchor_cell
+        self._anchor_cell = new_anchor_cell
+        self._anchor_cell_cache = None
         try:
-            if type(new_anchor_cell) is Cell:
-                self._anchor_cell = (new_anchor_cell.row, new_anchor_cell.col)
-                self._update_position()
-            else:
-                self._anchor_cell = format_addr(new_anchor_cell, 'tuple')
-                self._update_position()
-        except:
+            self._update_position()
+        except HttpError:
             self._anchor_cell = temp
+            self._anchor_cell_cache = None
 
     def delete(self):
         """
@@ -201,26 +253,121 @@ class Chart(object):
         .. warning::
             Once the chart is deleted the objects of that chart still exist and should not be used.  
         """
+        # updates still waiting for the chart would make the api reject the whole batch
+        self._dirty_fields.clear()
+        self._pending_requests = [request for request in self._pending_requests
+                                  if 'updateChartSpec' not in request and 'updateEmbeddedObjectPosition' not in request]
         request = {
             "deleteEmbeddedObject": {
                 "objectId": self._chart_id
             }
         }
-        self._worksheet.client.sheet.batch_update(self._worksheet.spreadsheet.id, request)
-
-    def refresh(self):
-        """Refreshes the object to incorporate the changes made in the chart through other objects or Google sheet"""
-        chart_data = self._worksheet.client.sheet.get(self._worksheet.spreadsheet.id, fields='sheets(charts,properties)')
-        sheet_list = chart_data.get('sheets')
-        for sheet in sheet_list:
-            if sheet.get('properties', {}).get('sheetId', None) is self._worksheet.id:
-                chart_list = sheet.get('charts')
-                if chart_list:
-                    for chart in chart_list:
-                        if chart.get('chartId') == self._chart_id:
-                            self.set_json(chart)
+        self._send_request(request)
+
+    @contextmanager
+    def batch(self):
+        """
+        Context manager which collects all the changes made to the chart and sends them
+        in a single batch update when the block exits.
+
+        >>> with chart.batch():
+        ...     chart.title = 'Rainfall'
+        ...     chart.legend_position = 'BOTTOM_LEGEND'
+        ...     chart.anchor_cell = 'H2'
+
+        .. note::
+            If the block raises or the update fails, nothing is sent and the chart is restored to its
+            state before the block, including the changes still pending for the next :meth:`flush`.
+        """
+        if self._batching:
+            yield self
+            return
+        state = self._get_state()
+        self._batching = True
+        try:
+            yield self
+            if self._dirty_fields:
+                self._pending_requests.append(self._spec_request())
+            if self._pending_requests:
+                self._batch_update(self._pending_requests)
+            self._dirty_fields.clear()
+        except BaseException:
+            self._set_state(state)
+            raise
+        finally:
+            self._batching = False
+            self._pending_requests = []
+
+    def _get_state(self):
+        return [getattr(self, name) for name in _BATCH_STATE], set(self._dirty_fields)
+
+    def _set_state(self, state):
+        values, self._dirty_fields = state
+        for name, value in zip(_BATCH_STATE, values):
+            setattr(self, name, value)
+        self._anchor_cell_cache = None
+        self._json_cache = None
+
+    def flush(self):
+        """
+        Sends the pending title, font and legend changes to the sheet.
+        Inside :meth:`batch` they are sent when the block exits.
+        """
+        if self._dirty_fields:
+            self.update_chart()
+
+    def _send_request(self, request):
+        if self._batching:
+            self._pending_requests.append(request)
+        else:
+            self._batch_update([request])
+
+    def _batch_update(self, requests):
+        self._worksheet._chart_index_cache = None
+        return self._worksheet.client.sheet.batch_update(self._worksheet.spreadsheet.id, requests)
+
+    def refresh(self, max_age=None):
+        """Refreshes the object to incorporate the changes made in the chart through other objects or Google sheet
+
+        Pending title, font and legend changes are sent with :meth:`flush` first, so they are not lost.
+        Inside :meth:`batch` they are only sent when the block exits.
+
+        The fetched charts are shared by all charts of the worksheet for :attr:`refresh_ttl` seconds, or until
+        one of them is updated.
+
+        :param max_age: Seconds for which charts fetched earlier are reused by this call, instead of
+                        :attr:`refresh_ttl`. Use 0 to always fetch the chart again.
+        """
+        if not self._batching:
+            self.flush()
+        elif self._dirty_fields:
+            self._pending_requests.append(self._spec_request())
+        now = time.monotonic()
+        cache = self._worksheet._chart_index_cache
+        if max_age is None:
+            max_age = self.refresh_ttl
+        if cache is not None and now - cache[0] < max_age:
+            chart_index = cache[1]
+        else:
+            fields = ('sheets(properties/sheetId,charts(chartId,position/overlayPosition/anchorCell,'
+                      'spec(title,titleTextFormat/fontFamily,basicChart(chartType,legendPosition,'
+                      'domains/domain/sourceRange/sources,series/series/sourceRange/sources))))')
+            chart_data = self._worksheet.client.sheet.get(self._worksheet.spreadsheet.id, fields=fields)
+            sheet_list = chart_data.get('sheets')
+            chart_index = {sheet.get('properties', {}).get('sheetId', None):
+                           {chart.get('chartId'): chart for chart in sheet.get('charts') or []}
+                           for sheet in sheet_list}
+            self._worksheet._chart_index_cache = (now, chart_index)
+        chart_json = chart_index.get(self._worksheet.id, {}).get(self._chart_id)
+        if chart_json:
+            self.set_json(chart_json)
 
     def _get_anchor_cell(self):
+        if self._anchor_cell_cache is None:
+            self._anchor_cell_cache = self._build_anchor_cell()
+        return self._anchor_cell_cache
+
+    def _build_anchor_cell(self):
         if self._anchor_cell is None:
             if self._domain:
                 return {
@@ -240,26 +387,30 @@ class Chart(object):
                     "columnIndex": cell[1]-1,
                     "rowIndex": cell[0]-1, "sheetId": self._worksheet.id}
 
+    def _gridrange(self, start, end):
+        key = (start, end)
+        gridrange = self._gridrange_cache.get(key)
+        if gridrange is None:
+            gridrange = self._gridrange_cache[key] = self._worksheet.get_gridrange(start, end)
+        return gridrange
+
     def _get_ranges_request(self):
-        ranges_request_list = []
-        for i in range(len(self._ranges)):
-            req = {
-                'series': {
-                    'sourceRange': {
-                        'sources': [self._worksheet.get_gridrange(self._ranges[i][0], self._ranges[i][1])]
-                    }
-                },
-            }
-            ranges_request_list.append(req)
-        return ranges_request_list
+        return [{'series': {'sourceRange': {'sources': [self._gridrange(start, end)]}}}
+                for start, end in self._ranges]
+
+    def _check_chart_type(self):
+        # charts other than basic charts are read with a chart_type of None and cannot be rebuilt
+        if self._chart_type is None:
+            raise InvalidArgumentValue('chart_type: only basic charts can be created or updated')
 
     def _create_chart(self):
+        self._check_chart_type()
         domains = []
         if self._domain:
             domains.append({
                 "domain": {
                     "sourceRange": {
-                        "sources": [self._worksheet.get_gridrange(self._domain[0], self._domain[1])]
+                        "sources": [self._gridrange(self._domain[0], self._domain[1])]
                     }
                 }
             })
@@ -283,7 +434,7 @@ class Chart(object):
             }
           }
         }
-        response = self._worksheet.client.sheet.batch_update(self._worksheet.spreadsheet.id, request)
+        response = self._batch_update([request])
         chart_data_list = response.get('replies')
         chart_json = chart_data_list[0].get('addChart',{}).get('chart')
         self.set_json(chart_json)
@@ -294,41 +445,47 @@ class Chart(object):
                 "objectId": self._chart_id,
                 "newPosition": {
                     "overlayPosition": {
-                        "anchorCell": {
-                            "sheetId": self._worksheet.id,
-                            "rowIndex": self._anchor_cell[0]-1,
-                            "columnIndex": self._anchor_cell[1]-1
-                        }
+                        "anchorCell": self._get_anchor_cell()
                     }
                 },
-                "fields": "*"
+                "fields": "anchorCell"
         }} 
-        self._worksheet.client.sheet.batch_update(self._worksheet.spreadsheet.id, request)
+        with self.batch():
+            self._send_request(request)
 
     def update_chart(self):
-        """updates the applied changes to the sheet."""
-        request = {
+        """updates the applied changes to the sheet. Inside :meth:`batch` a single update is sent when the block exits."""
+        if self._batching:
+            # domain, ranges and chart type go out with the visual fields in one spec
+            self._dirty_fields.add('spec')
+            return
+        self._batch_update([self._spec_request()])
+        self._dirty_fields.clear()
+
+    def _spec_request(self):
+        return {
             'updateChartSpec':{
                 'chartId': self._chart_id, "spec": self.get_json()}
         }
-        self._worksheet.client.sheet.batch_update(self._worksheet.spreadsheet.id, request)
 
     def get_json(self):
-        """Returns the chart as a dictionary structured like the Google Sheets API v4."""
+        """Returns the chart as a dictionary structured like the Google Sheets API v4.
+
+        The dictionary is cached until the chart is changed, so it should not be modified.
+        """
+        if self._json_cache is not None:
+            return self._json_cache
+        self._check_chart_type()
 
-        domains = [{'domain': {'sourceRange': {'sources': [
-            self._worksheet.get_gridrange(self._domain[0], self._domain[1])]}}}]
+        domains = []
+        if self._domain:
+            domains.append({'domain': {'sourceRange': {'sources': [self._gridrange(self._domain[0], self._domain[1])]}}})
         ranges = self._get_ranges_request()
-        spec = dict()
-        spec['title'] = self._title
-        spec['basicChart'] = dict()
-        spec['titleTextFormat'] = dict()
-        spec['basicChart']['chartType'] = self._chart_type.value
-        spec['basicChart']['legendPosition'] = self._legend_position
-        spec['titleTextFormat']['fontFamily'] = self._title_font_family
-        spec['fontName'] = self._font_name
-        spec['basicChart']['domains'] = domains
-        spec['basicChart']['series'] = ranges
+        spec = {**_SPEC_TEMPLATE, 'title': self._title, 'fontName': self._font_name}
+        spec['basicChart'] = {**_SPEC_TEMPLATE['basicChart'], 'chartType': self._chart_type.value,
+                              'legendPosition': self._legend_position, 'domains': domains, 'series': ranges}
+        spec['titleTextFormat'] = {**_SPEC_TEMPLATE['titleTextFormat'], 'fontFamily': self._title_font_family}
+        self._json_cache = spec
         return spec
 
     def set_json(self, chart_data):
@@ -337,34 +494,30 @@ class Chart(object):
 
         :param chart_data:   The chart data as json specified in sheets api.
         """
-        anchor_cell_data = chart_data.get('position',{}).get('overlayPosition',{}).get('anchorCell')
+        self._dirty_fields = set()
+        self._gridrange_cache = {}
+        self._anchor_cell_cache = None
+        self._json_cache = None
+        spec = chart_data.get('spec') or {}
+        position = chart_data.get('position') or {}
+        overlay_position = position.get('overlayPosition') or {}
+        anchor_cell_data = overlay_position.get('anchorCell') or {}
+        title_text_format = spec.get('titleTextFormat') or {}
+        basic_chart = spec.get('basicChart') or {}
         self._anchor_cell = (anchor_cell_data.get('rowIndex',0)+1, anchor_cell_data.get('columnIndex',0)+1)
-        self._title = chart_data.get('spec',{}).get('title',None)
-        self._chart_id = chart_data.get('chartId',None)
-        self._title_font_family = chart_data.get('spec',{}).get('titleTextFormat',{}).get('fontFamily',None)
-        self._font_name = chart_data.get('spec',{}).get('titleTextFormat',{}).get('fontFamily',None)    
-        basic_chart = chart_data.get('spec',{}).get('basicChart', None)
-        self._chart_type = ChartType(basic_chart.get('chartType', None))
+        self._title = spec.get('title')
+        self._chart_id = chart_data.get('chartId')
+        self._title_font_family = title_text_format.get('fontFamily')
+        self._font_name = title_text_format.get('fontFamily')
+        self._chart_type = _CHART_TYPE_MAP.get(basic_chart.get('chartType'))
         self._legend_position = basic_chart.get('legendPosition', None)
-        domain_list = basic_chart.get('domains', [])
-        for d in domain_list:
-            source_list = d.get('domain', {}).get('sourceRange', {}).get('sources', None)
-            for source in source_list:
-                start_row = source.get('startRowIndex',0)
-                end_row = source.get('endRowIndex',0)
-                start_column = source.get('startColumnIndex',0)
-                end_column = source.get('endColumnIndex',0)
-                self._domain = [(start_row+1, start_column+1),(end_row, end_column)]
-        range_list = basic_chart.get('series', [])
-        self._ranges = []
-        for r in range_list:
-            source_list = r.get('series',{}).get('sourceRange',{}).get('sources',None)
-            for source in source_list:
-                start_row = source.get('startRowIndex',0)
-                end_row = source.get('endRowIndex',0)
-                start_column = source.get('startColumnIndex',0)
-                end_column = source.get('endColumnIndex',0)
-                self._ranges.append([(start_row+1, start_column+1), (end_row, end_column)])
+        domain_sources = _chart_data_sources(basic_chart.get('domains') or [], 'domain')
+        if domain_sources:
+            # a basic chart only supports a single domain
+            self._domain = _source_to_range(domain_sources[0])
+        range_sources = _chart_data_sources(basic_chart.get('series') or [], 'series')
+        self._ranges = [_source_to_range(source) for source in range_sources]
 
     def __repr__(self):
-        return '<%s %s %s>' % (self.__class__.__name__, self.chart_type.value, repr(self.title))
+        chart_type = self.chart_type.value if self.chart_type is not None else None
+        return '<%s %s %s>' % (self.__class__.__name__, chart_type, repr(self.title))
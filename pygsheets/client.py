@@ -45,7 +45,9 @@ class Client(object):
     :param retries:                 (Optional) Number of times to retry a connection before raising a TimeOut error.
                                     Default: 3
     :param http:                    The underlying HTTP object to use to make requests. If not specified, a
-                                    :class:`httplib2.Http` instance will be constructed.
+                                    :class:`httplib2.Http` instance will be constructed. The same object is used
+                                    by the sheet and drive APIs, so its connections are kept alive and reused
+                                    across requests.
     :param check:                   Check for quota error and apply rate limiting.
     :param seconds_per_quota:       Default value is 100 seconds
 
@@ -120,7 +120,7 @@ class ChartType(Enum):
     COMBO = "COMBO"
     STEPPED_AREA = "STEPPED_AREA"
 
-class PivotValueLayout(Enum):
+class PivotValueLayout(str, Enum):
     """Enum for Pivot Table Value Layout
 
     Reference: `<https://developers.google.com/sheets/api/reference/rest/v4/spreadsheets/pivot-tables#PivotValueLayout>`_
@@ -128,7 +128,7 @@ class PivotValueLayout(Enum):
     HORIZONTAL = "HORIZONTAL"
     VERTICAL = "VERTICAL"
 
-class SortOrder(Enum):
+class SortOrder(str, Enum):
     """Enum for Sorting Order
 
     Reference: `<https://developers.google.com/sheets/api/reference/rest/v4/spreadsheets/other#SortOrder>`_
@@ -136,7 +136,7 @@ class SortOrder(Enum):
     ASCENDING = "ASCENDING"
     DESCENDING = "DESCENDING"
 
-class DateTimeRuleType(Enum):
+class DateTimeRuleType(str, Enum):
     """Enum for DateTimeRuleType
 
     Reference: `<https://developers.google.com/sheets/api/reference/rest/v4/spreadsheets/pivot-tables#datetimeruletype>`_
@@ -8,15 +8,38 @@ This module represents a pivottable within the worksheet.
 
 """
 from enum import Enum
+from operator import methodcaller
 from typing import List, Dict, Any
 
 from pygsheets.address import GridRange
-from pygsheets.spreadsheet import Spreadsheet
 from pygsheets.utils import format_addr
-from pygsheets.custom_types import SortOrder, DateTimeRuleType
+from pygsheets.custom_types import SortOrder, DateTimeRuleType, PivotValueLayout
 from pygsheets.exceptions import InvalidArgumentValue 
 
+
+_VALUE_LAYOUT_MAP = PivotValueLayout._value2member_map_
+
+_to_json = methodcaller("to_json")
+_get_json = methodcaller("get_json")
+
+
+def _groups_json(groups):
+    """Json list of the given pivot groups."""
+    return list(map(_to_json, groups))
+
+
+def _items_json(items):
+    """Json list of the given pivot values, filter specs or value metadata."""
+    return list(map(_get_json, items))
+
+
+def _source_json(source):
+    """Json of a pivot table source given as a GridRange or as its api json."""
+    return source if isinstance(source, dict) else source.to_json()
+
 class PivotGroupValueMetadata(object):
+    __slots__ = ('_value', '_collapsed')
+
     def __init__(self, value, collapsed: bool = None):
         self._value = value
         self._collapsed = collapsed
@@ -28,6 +51,8 @@ class PivotGroupValueMetadata(object):
         }
 
 class PivotGroupSortValueBucket(object):
+    __slots__ = ('_values_index', '_buckets')
+
     def __init__(self, values_index: int, buckets: list):
         self._values_index = values_index
         self._buckets = buckets
@@ -39,10 +64,14 @@ class PivotGroupSortValueBucket(object):
         }
 
 class PivotGroupRule(object):
+    __slots__ = ()
+
     def get_json(self) -> dict:
         return {}
 
 class ManualRule(PivotGroupRule):
+    __slots__ = ('_groups',)
+
     def __init__(self, groups: Dict[str, Any]):
         self._groups = groups
     
@@ -52,6 +81,8 @@ class ManualRule(PivotGroupRule):
         }
 
 class HistogramRule(PivotGroupRule):
+    __slots__ = ('_interval', '_start', '_end')
+
     def __init__(self, interval: float, start: float, end: float):
         self._interval = interval
         self._start = start
@@ -65,6 +96,8 @@ class HistogramRule(PivotGroupRule):
         }
 
 class DateTimeRule(PivotGroupRule):
+    __slots__ = ('_type',)
+
     def __init__(self, time_rule_type: DateTimeRuleType):
         self._type = time_rule_type
     
@@ -75,6 +108,8 @@ class DateTimeRule(PivotGroupRule):
     
 
 class PivotGroupLimit:
+    __slots__ = ('_count_limit', '_apply_order')
+
     # (countLimit: int, applyOrder: int)
     def __init__(self, count_limit: int, apply_order: int):
         self._count_limit = count_limit
@@ -87,6 +122,8 @@ class PivotGroupLimit:
         }
 
 class PivotFilterCriteria:
+    __slots__ = ('_visible_values', '_condition', '_visible_by_default')
+
     def __init__(self, visible_values: List[str], condition: str, visible_by_default: bool):
         self._visible_values = visible_values
         self._condition = condition
@@ -100,8 +137,10 @@ class PivotFilterCriteria:
         }
 
 class PivotFilterSpec:
+    __slots__ = ('_filter_criteria', '_column_offset_index', '_data_source_column_reference')
+
     def __init__(self, filter_criteria: PivotFilterCriteria, column_offset_index: int = None, data_source_column_reference: tuple = None):
-        if (column_offset_index == None) == (data_source_column_reference == None):
+        if (column_offset_index is None) == (data_source_column_reference is None):
             raise InvalidArgumentValue("Union Field Source Cannot have both values!")
         
         self._filter_criteria = filter_criteria
@@ -110,18 +149,18 @@ class PivotFilterSpec:
     
     def get_json(self):
         res = {
-            "filterCriteria": self._filter_criteria
+            "filterCriteria": self._filter_criteria.get_json()
         }
 
-        if self._column_offset_index:
+        if self._column_offset_index is not None:
             res["columnOffsetIndex"] = self._column_offset_index
         
-        if self._data_source_column_reference:
+        if self._data_source_column_reference is not None:
             res["dataSourceColumnReference"] = self._data_source_column_reference
         
         return res
 
-class PivotValueSummarizeFunction(Enum):
+class PivotValueSummarizeFunction(str, Enum):
     SUM = "SUM"
     COUNTA = "COUNTA"
     COUNT = "COUNT"
@@ -137,16 +176,15 @@ class PivotValueSummarizeFunction(Enum):
     VARP = "VARP"
     CUSTOM = "CUSTOM"
 
-class PivotValueCalculatedDisplayType(Enum):
+class PivotValueCalculatedDisplayType(str, Enum):
     PERCENT_OF_ROW_TOTAL = "PERCENT_OF_ROW_TOTAL"
     PERCENT_OF_COLUMN_TOTAL = "PERCENT_OF_COLUMN_TOTAL"
     PERCENT_OF_GRAND_TOTAL = "PERCENT_OF_GRAND_TOTAL"
 
-class PivotValueLayout(Enum):
-    HORIZONTAL = "HORIZONTAL"
-    VERTICAL = "VERTICAL"
-
 class PivotValue:
+    __slots__ = ('_summarize_function', '_name', '_calculated_display_type', '_source_column_offset',
+                 '_formula', '_data_source_column_reference')
+
     # (
     ##  summarizeFunction: PivotValueSummarizeFunction, 
     ##  name: string,  
@@ -176,7 +214,7 @@ class PivotValue:
             "summarizeFunction": self._summarize_function,
             "name": self._name,
             "calculatedDisplayType": self._calculated_display_type,
-            "sourcecolumnOffset": self._source_column_offset,
+            "sourceColumnOffset": self._source_column_offset,
             "formula": self._formula,
             "dataSourceColumnReference": self._data_source_column_reference
         }
@@ -201,6 +239,10 @@ class PivotGroup(object):
         <https://developers.google.com/sheets/api/reference/rest/v4/spreadsheets#BasicChartSpec>`__.
 
     """
+    __slots__ = ('_label', '_group_rule', '_source', '_column_offset', '_show_totals', '_repeat_headings',
+                 '_sort_order', '_value_bucket', '_group_limit', '_metadata', '_json_src', '_json_obj',
+                 '_dirty', '_cached_dirty')
+
     def __init__(
         self,
         label: str,
@@ -212,22 +254,28 @@ class PivotGroup(object):
         sort_order: SortOrder = SortOrder.ASCENDING,
         value_bucket: PivotGroupSortValueBucket | None = None,
         group_limit: PivotGroupLimit | None = None,
-        metadata: List[PivotGroupValueMetadata] = [],
-        json_obj = {},
+        metadata: List[PivotGroupValueMetadata] | None = None,
+        json_obj: dict | None = None,
     ):
         self._label = label
         self._group_rule = group_rule
         self._source = source
         if source:
-            self._source = (format_addr(source[0], 'tuple'), format_addr(source[1], 'tuple'))
+            start, end = source
+            if not (isinstance(start, tuple) and isinstance(end, tuple)):
+                start, end = format_addr(start, 'tuple'), format_addr(end, 'tuple')
+            self._source = (start, end)
         self._column_offset = column_offset
         self._show_totals = show_totals
         self._repeat_headings = repeat_headings
         self._sort_order = sort_order
         self._value_bucket = value_bucket
         self._group_limit = group_limit
-        self._metadata = metadata
-        self.set_json(json_obj)
+        self._metadata = metadata if metadata is not None else ()
+        self._json_obj = None
+        self._dirty = 0
+        self._cached_dirty = -1
+        self.set_json(json_obj if json_obj is not None else {})
     
     @property
     def label(self):
@@ -236,6 +284,7 @@ class PivotGroup(object):
     @label.setter
     def label(self, value: str):
         self._label = value
+        self._changed("label")
 
     @property
     def group_rule(self):
@@ -244,6 +293,7 @@ class PivotGroup(object):
     @group_rule.setter
     def group_rule(self, value: PivotGroupRule):
         self._group_rule = value
+        self._changed("groupRule")
     
     @property
     def source(self):
@@ -252,6 +302,7 @@ class PivotGroup(object):
     @source.setter
     def source(self, value: tuple):
         self._source = value
+        self._dirty += 1
     
     @property
     def column_offset(self):
@@ -260,6 +311,7 @@ class PivotGroup(object):
     @column_offset.setter
     def column_offset(self, value: int):
         self._column_offset = value
+        self._changed("sourceColumnOffset")
     
     @property
     def show_totals(self):
@@ -268,6 +320,7 @@ class PivotGroup(object):
     @show_totals.setter
     def show_totals(self, value: bool):
         self._show_totals = value
+        self._changed("showTotals")
     
     @property
     def repeat_headings(self):
@@ -276,6 +329,7 @@ class PivotGroup(object):
     @repeat_headings.setter
     def repeat_headings(self, value: bool):
         self._repeat_headings = value
+        self._changed("repeatHeadings")
     
     @property
     def sort_order(self):
@@ -284,6 +338,7 @@ class PivotGroup(object):
     @sort_order.setter
     def sort_order(self, value: SortOrder):
         self._sort_order = value
+        self._changed("sortOrder")
     
     @property
     def value_bucket(self):
@@ -292,6 +347,7 @@ class PivotGroup(object):
     @value_bucket.setter
     def value_bucket(self, value: PivotGroupSortValueBucket):
         self._value_bucket = value
+        self._changed("valueBucket")
     
     @property
     def group_limit(self):
@@ -299,7 +355,8 @@ class PivotGroup(object):
     
     @group_limit.setter
     def group_limit(self, value: PivotGroupLimit):
-        self._group_limit
+        self._group_limit = value
+        self._changed("groupLimit")
     
     @property
     def metadata(self):
@@ -308,42 +365,65 @@ class PivotGroup(object):
     @metadata.setter
     def metadata(self, value: List[PivotGroupValueMetadata]):
         self._metadata = value
+        self._changed("valueMetadata")
     
     @property
     def json_obj(self):
-        return self.json_obj
+        return self.to_json()
     
     @json_obj.setter
     def json_obj(self, value: dict):
         self.set_json(value)
 
     def set_json(self, json_obj: dict):
-        self._json_obj = {
+        self._json_src = dict(json_obj)
+        self._dirty += 1
+
+    def _changed(self, key):
+        # a value set through a property takes the place of the one given to set_json
+        self._json_src.pop(key, None)
+        self._dirty += 1
+
+    def _build_json(self):
+        json_obj = self._json_src
+        value_metadata = json_obj.get("valueMetadata")
+        group_rule = json_obj.get("groupRule")
+        group_limit = json_obj.get("groupLimit")
+        group_json = {
             "showTotals": json_obj.get("showTotals", self._show_totals),
-            "valueMetadata": json_obj.get("valueMetadata", 
-                lambda: list(map(PivotGroupValueMetadata.get_json, self._metadata))
-            ),
-            "sortOrder": json_obj.get("sortOrder", self._sort_order.value),
+            "valueMetadata": value_metadata if value_metadata is not None else _items_json(self._metadata),
+            "sortOrder": json_obj.get("sortOrder", self._sort_order),
             "repeatHeadings": json_obj.get("repeatHeadings", self._repeat_headings),
             "label": json_obj.get("label", self._label),
-            "groupRule": json_obj.get("groupRule", lambda: self._group_rule.get_json()),
-            "groupLimit": json_obj.get("groupLimit", lambda: self._group_limit.get_json()),
         }
 
-        if json_obj.get("valueBucket", None) or self._value_bucket:
-            self._json_obj["valueBucket"] = \
-                json_obj.get("valueBucket", lambda: self._value_bucket.get_json())
-        
-        if json_obj.get("sourceColumnOffset", None) or self._column_offset:
-            self._json_obj["sourceColumnOffset"] = \
-                json_obj.get("sourceColumn_Offset", self._column_offset)
+        if group_rule is not None or self._group_rule is not None:
+            group_json["groupRule"] = group_rule if group_rule is not None else self._group_rule.get_json()
+
+        if group_limit is not None or self._group_limit is not None:
+            group_json["groupLimit"] = group_limit if group_limit is not None else self._group_limit.get_json()
+
+        value_bucket = json_obj.get("valueBucket")
+        if value_bucket is not None or self._value_bucket is not None:
+            group_json["valueBucket"] = \
+                value_bucket if value_bucket is not None else self._value_bucket.get_json()
         
-        if json_obj.get("dataSourceColumnReference", None) or self._source:
-            self._json_obj.get("dataSourceColumnReference", lambda: self._source[0] + self._source[1])
+        source_column_offset = json_obj.get("sourceColumnOffset")
+        if source_column_offset is not None or self._column_offset is not None:
+            group_json["sourceColumnOffset"] = \
+                source_column_offset if source_column_offset is not None else self._column_offset
         
+        data_source_column_reference = json_obj.get("dataSourceColumnReference")
+        if data_source_column_reference is not None:
+            group_json["dataSourceColumnReference"] = data_source_column_reference
+        return group_json
 
     def to_json(self) -> dict:
-        return self.json_obj
+        """Json of the group as given in the api. Rebuilt only after a setter has changed the group."""
+        if self._dirty != self._cached_dirty:
+            self._json_obj = self._build_json()
+            self._cached_dirty = self._dirty
+        return self._json_obj
 
 
 class PivotTable(object):
@@ -356,7 +436,7 @@ class PivotTable(object):
     :param rows:            Row Groupings For the Pivot Table
     :param columns:         Column Groupings For the Pivot Table
     :param values:          Value Calculation From Source on how the values should be calculated
-    :param source:          Cell range of the desired pivot table data in the form of tuple of tuples
+    :param source:          Cell range of the desired pivot table data in the form of tuple of tuples, or the GridRange api json
     :param layout:          Horizontal/Vertical Layout of Pivot Table Data
     :param filter_specs:    Filtering Settings for unwanted data to be included in table
     :param json_obj:        Represents a json structure of the chart as given in `api <https://developers.google.com/sheets/api/reference/rest/v4/spreadsheets/pivot-tables>`__.
@@ -368,52 +448,71 @@ class PivotTable(object):
 
 
     """
+    __slots__ = ('_worksheet', '_source', '_data_source_id', '_rows', '_columns', '_values', '_layout',
+                 '_filter_specs', '_json_obj')
+
     def __init__(
         self,
-        worksheet : Spreadsheet | None = None,
-        source: GridRange | None = None,
+        worksheet=None,
+        source: GridRange | dict | None = None,
         data_source_id: str = None,
-        rows: List[PivotGroup] = [],
-        columns: List[PivotGroup] = [],
-        values:  List[PivotValue] = [],
+        rows: List[PivotGroup] | None = None,
+        columns: List[PivotGroup] | None = None,
+        values:  List[PivotValue] | None = None,
         layout: PivotValueLayout = PivotValueLayout.HORIZONTAL,
-        filter_specs: List[PivotFilterSpec] = [],
-        json_obj = {},
+        filter_specs: List[PivotFilterSpec] | None = None,
+        json_obj: dict | None = None,
     ):
-        if (source == None) == (data_source_id == None):
+        if (source is None) == (data_source_id is None):
             raise InvalidArgumentValue("Source and Datasource cannot be none!")
         
         self._worksheet = worksheet
         self._source = source
         self._data_source_id = data_source_id
-        self._rows = rows
-        self._columns = columns
-        self._values = values
+        self._rows = rows if rows is not None else ()
+        self._columns = columns if columns is not None else ()
+        self._values = values if values is not None else ()
         self._layout = layout
-        self._filter_specs = filter_specs
-        self.set_json(json_obj)
+        self._filter_specs = filter_specs if filter_specs is not None else ()
+        self.set_json(json_obj if json_obj is not None else {})
     
 
     @classmethod
-    def from_json(worksheet: Spreadsheet, json_obj: dict):
+    def from_json(cls, worksheet, json_obj: dict):
+        """
+        Creates a pivot table from the json returned by the api. The json is used as is, without
+        being validated or rebuilt.
+
+        :param worksheet:   Worksheet object in which the pivot table resides
+        :param json_obj:    Pivot table json as given in the `api <https://developers.google.com/sheets/api/reference/rest/v4/spreadsheets/pivot-tables>`__.
+        """
         source = json_obj.get("source", None)
-        grange = None
-        if source:
-            grange = GridRange(worksheet=worksheet, propertiesjson=source)
-        
-        return PivotTable(
-            worksheet=worksheet, 
-            source=grange, 
-            data_source_id=json_obj.get("dataSourceId", None),
-            json_obj=json_obj
-        )
+        value_layout = json_obj.get("valueLayout")
+
+        pivot_table = cls.__new__(cls)
+        pivot_table._worksheet = worksheet
+        pivot_table._source = GridRange(worksheet=worksheet, propertiesjson=source) if source else None
+        pivot_table._data_source_id = json_obj.get("dataSourceId", None)
+        pivot_table._rows = ()
+        pivot_table._columns = ()
+        pivot_table._values = ()
+        pivot_table._layout = _VALUE_LAYOUT_MAP.get(value_layout, PivotValueLayout.HORIZONTAL)
+        pivot_table._filter_specs = ()
+        pivot_table._json_obj = dict(json_obj)
+        return pivot_table
 
     @property
     def source(self) -> GridRange:
         return self._source
 
     @source.setter
-    def source(self, value: GridRange | None):
+    def source(self, value: GridRange | dict | None):
+        if value is None:
+            self._json_obj.pop("source", None)
+        elif "dataSourceId" in self._json_obj:
+            raise InvalidArgumentValue("source and dataSourceId are both defined")
+        else:
+            self._json_obj["source"] = _source_json(value)
         self._source = value
     
     @property
@@ -422,6 +521,12 @@ class PivotTable(object):
 
     @data_source_id.setter
     def data_source_id(self, value: str):
+        if value is None:
+            self._json_obj.pop("dataSourceId", None)
+        elif "source" in self._json_obj:
+            raise InvalidArgumentValue("source and dataSourceId are both defined")
+        else:
+            self._json_obj["dataSourceId"] = value
         self._data_source_id = value
 
     @property
@@ -431,6 +536,7 @@ class PivotTable(object):
     @rows.setter
     def rows(self, value: List[PivotGroup]):
         self._rows = value
+        self._json_obj["rows"] = _groups_json(value)
     
     @property
     def columns(self) -> List[PivotGroup]:
@@ -439,6 +545,7 @@ class PivotTable(object):
     @columns.setter
     def columns(self, value: List[PivotGroup]):
         self._columns = value
+        self._json_obj["columns"] = _groups_json(value)
     
     @property
     def values(self) -> List[PivotValue]:
@@ -447,6 +554,7 @@ class PivotTable(object):
     @values.setter
     def values(self, value: List[PivotValue]):
         self._values = value
+        self._json_obj["values"] = _items_json(value)
     
     @property
     def layout(self) -> PivotValueLayout:
@@ -455,39 +563,68 @@ class PivotTable(object):
     @layout.setter
     def layout(self, value: PivotValueLayout):
         self._layout = value
+        self._json_obj["valueLayout"] = value
     
     @property
     def filter_specs(self):
-        return self.filter_specs
+        return self._filter_specs
 
     @filter_specs.setter
     def filter_specs(self, value: List[PivotFilterSpec]):
         self._filter_specs = value
+        self._json_obj["filterSpecs"] = _items_json(value)
     
     @property
     def json_obj(self):
-        return self._json_obj
+        return self.to_json()
     
     @json_obj.setter
     def json_obj(self, value: dict):
         self.set_json(value)
 
+    def to_json(self) -> dict:
+        """
+        Json of the pivot table as given in the api. The rows and columns are read from their groups
+        on every call, so changes made to a group after adding it to the table are included.
+        """
+        if self._rows:
+            self._json_obj["rows"] = _groups_json(self._rows)
+        if self._columns:
+            self._json_obj["columns"] = _groups_json(self._columns)
+        return self._json_obj
+
     def set_json(self, json_obj: dict):
+        get = json_obj.get
+        rows = get("rows")
+        columns = get("columns")
+        filter_specs = get("filterSpecs")
+        values = get("values")
+        value_layout = get("valueLayout")
+        source = get("source")
+        data_source_id = get("dataSourceId")
+        # rows or columns given as json replace the groups, which no longer describe them
+        if rows is not None:
+            self._rows = ()
+        if columns is not None:
+            self._columns = ()
+
         self._json_obj = {
-            "rows": json_obj.get("rows", lambda : list(map(PivotGroup.to_json, self._rows))),
-            "columns": json_obj.get("columns", lambda : list(map(PivotGroup.to_json, self._columns))),
-            "filterSpecs": json_obj.get("filterSpecs", lambda: list(map(PivotFilterSpec.get_json, self._filter_specs))),
-            "values": json_obj.get("values", lambda: list(map(PivotValue.get_json, self._values))),
-            "valueLayout": json_obj.get("valueLayout", self._layout.value)
+            "rows": rows if rows is not None else _groups_json(self._rows),
+            "columns": columns if columns is not None else _groups_json(self._columns),
+            "filterSpecs": filter_specs if filter_specs is not None else _items_json(self._filter_specs),
+            "values": values if values is not None else _items_json(self._values),
+            "valueLayout": value_layout if value_layout is not None else self._layout
         }
 
-        if json_obj.get("source", None) or self._source:
-            self._json_obj["source"] = json_obj.get("source", self._source.to_json())
+        if source is None and self._source is not None:
+            source = _source_json(self._source)
+        if source is not None:
+            self._json_obj["source"] = source
         
-        if json_obj.get("dataSourceId", None) or self._data_source_id:
-            self._json_obj["dataSourceId"] = json_obj.get("dataSourceId", self._data_source_id)
+        if data_source_id is not None or self._data_source_id is not None:
+            self._json_obj["dataSourceId"] = data_source_id if data_source_id is not None else self._data_source_id
         
-        if (self._json_obj["source"] != None) and (self._json_obj["dataSourceId"] != None):
+        if "source" in self._json_obj and "dataSourceId" in self._json_obj:
             raise InvalidArgumentValue("source and dataSourceId are both defined")
 
 
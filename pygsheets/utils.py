@@ -9,7 +9,7 @@ This module contains utility functions.
 """
 
 from pygsheets.exceptions import (IncorrectCellLabel, InvalidArgumentValue)
-from functools import wraps
+from functools import wraps, lru_cache
 import re
 
 
@@ -71,6 +71,9 @@ def is_number(n):
     return True
 
 
+_cell_addr_re = re.compile(r'([A-Za-z]+)(\d+)')
+
+
 def format_addr(addr, output='flip'):
         """
         function to convert address format of cells from one to another
@@ -81,6 +84,17 @@ def format_addr(addr, output='flip'):
                       - 'flip' will convert to other type
         :returns: tuple or label
         """
+        if output == 'tuple' and type(addr) == tuple:
+            return addr
+        try:
+            return _format_addr(addr, output)
+        except TypeError:
+            # unhashable address, skip the cache
+            return _format_addr.__wrapped__(addr, output)
+
+
+@lru_cache(maxsize=4096)
+def _format_addr(addr, output):
         _MAGIC_NUMBER = 64
         if type(addr) == tuple:
             if output == 'label' or output == 'flip':
@@ -115,7 +129,6 @@ def format_addr(addr, output='flip'):
 
         elif type(addr) == str:
             if output == 'tuple' or output == 'flip':
-                _cell_addr_re = re.compile(r'([A-Za-z]+)(\d+)')
                 m = _cell_addr_re.match(addr)
                 if m:
                     column_label = m.group(1).upper()
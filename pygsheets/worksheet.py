@@ -53,6 +53,7 @@ class Worksheet(object):
         self.data_grid = None  # for storing sheet data while unlinked
         self._func_calls = []
         self.grid_update_time = None
+        self._chart_index_cache = None  # (time, {sheetId: {chartId: chart}}) shared by Chart.refresh
 
     def __repr__(self):
         return '<%s %s index:%s>' % (self.__class__.__name__,
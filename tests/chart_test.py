@@ -0,0 +1,242 @@
+"""Tests of Chart which run against a mocked worksheet instead of the Google API."""
+
+import os
+import sys
+from unittest import mock
+
+import pytest
+from googleapiclient.errors import HttpError
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pygsheets.chart import Chart
+from pygsheets.custom_types import ChartType
+from pygsheets.exceptions import InvalidArgumentValue
+
+
+def grid_range(start_row, end_row, start_col, end_col):
+    return {'sheetId': 0, 'startRowIndex': start_row, 'endRowIndex': end_row,
+            'startColumnIndex': start_col, 'endColumnIndex': end_col}
+
+
+def titled(chart_json, title, **changes):
+    return dict(chart_json, spec=dict(chart_json['spec'], title=title), **changes)
+
+
+CHART_JSON = {
+    'chartId': 7,
+    'spec': {
+        'title': 'Rainfall',
+        'titleTextFormat': {'fontFamily': 'Roboto'},
+        'basicChart': {
+            'chartType': 'LINE',
+            'legendPosition': 'RIGHT_LEGEND',
+            'domains': [{'domain': {'sourceRange': {'sources': [grid_range(0, 6, 0, 1)]}}}],
+            'series': [{'series': {'sourceRange': {'sources': [grid_range(0, 6, 1, 2)]}}}],
+        },
+    },
+    'position': {'overlayPosition': {'anchorCell': {'sheetId': 0, 'rowIndex': 0, 'columnIndex': 3}}},
+}
+
+
+def http_error():
+    return HttpError(mock.Mock(status=400, reason='Bad Request'), b'')
+
+
+class TestChart(object):
+    def setup_method(self):
+        self.worksheet = mock.MagicMock()
+        self.worksheet.id = 0
+        self.worksheet._chart_index_cache = None
+        self.batch_update = self.worksheet.client.sheet.batch_update
+        self.chart = Chart(self.worksheet, json_obj=CHART_JSON)
+
+    def set_sheet_charts(self, *charts, **other_sheets):
+        sheets = [{'properties': {'sheetId': 0}, 'charts': list(charts)}]
+        sheets += [{'properties': {'sheetId': int(sheet_id[1:])}, 'charts': sheet_charts}
+                   for sheet_id, sheet_charts in other_sheets.items()]
+        self.worksheet.client.sheet.get.return_value = {'sheets': sheets}
+        return self.worksheet.client.sheet.get
+
+    def sent_requests(self):
+        return [request for call in self.batch_update.call_args_list for request in call.args[1]]
+
+    def test_visual_changes_wait_for_flush(self):
+        self.chart.title = 'new'
+        self.chart.legend_position = 'BOTTOM_LEGEND'
+        assert not self.batch_update.called
+
+        self.chart.flush()
+        assert self.batch_update.call_count == 1
+        spec = self.sent_requests()[0]['updateChartSpec']['spec']
+        assert spec['title'] == 'new'
+        assert spec['basicChart']['legendPosition'] == 'BOTTOM_LEGEND'
+
+        self.chart.flush()
+        assert self.batch_update.call_count == 1
+
+    def test_batch_sends_one_update(self):
+        with self.chart.batch():
+            self.chart.domain = ('A1', 'A7')
+            self.chart.ranges = [('B1', 'B7')]
+            self.chart.chart_type = ChartType.COLUMN
+            self.chart.title = 'new'
+            self.chart.anchor_cell = 'H2'
+        assert self.batch_update.call_count == 1
+        assert sorted(list(request)[0] for request in self.sent_requests()) == \
+            ['updateChartSpec', 'updateEmbeddedObjectPosition']
+        spec = [request for request in self.sent_requests() if 'updateChartSpec' in request][0]['updateChartSpec']['spec']
+        assert spec['title'] == 'new'
+        assert spec['basicChart']['chartType'] == 'COLUMN'
+        assert spec['basicChart']['domains'][0]['domain']['sourceRange']['sources'][0] is \
+            self.worksheet.get_gridrange.return_value
+
+        self.chart.flush()
+        assert self.batch_update.call_count == 1
+
+    def test_failed_move_keeps_visual_changes_pending(self):
+        self.chart.title = 'new'
+        self.batch_update.side_effect = http_error()
+        self.chart.anchor_cell = 'H2'
+        assert self.chart.anchor_cell == (1, 4)
+        assert self.chart.title == 'new'
+
+        self.batch_update.reset_mock(side_effect=True)
+        self.chart.flush()
+        assert self.sent_requests()[0]['updateChartSpec']['spec']['title'] == 'new'
+
+    def test_failed_batch_restores_chart(self):
+        self.chart.font_name = 'Arial'
+        self.batch_update.side_effect = http_error()
+        with pytest.raises(HttpError):
+            with self.chart.batch():
+                self.chart.title = 'new'
+                self.chart.domain = ('A1', 'A7')
+        assert self.chart.title == 'Rainfall'
+        assert self.chart.domain == [(1, 1), (6, 1)]
+
+        self.batch_update.reset_mock(side_effect=True)
+        self.chart.flush()
+        spec = self.sent_requests()[0]['updateChartSpec']['spec']
+        assert spec['fontName'] == 'Arial'
+        assert spec['title'] == 'Rainfall'
+
+    def test_exception_in_batch_restores_chart(self):
+        with pytest.raises(ValueError):
+            with self.chart.batch():
+                self.chart.domain = ('A1', 'A7')
+                self.chart.title = 'new'
+                raise ValueError
+        assert not self.batch_update.called
+        assert self.chart.domain == [(1, 1), (6, 1)]
+        assert self.chart.title == 'Rainfall'
+
+        self.chart.flush()
+        assert not self.batch_update.called
+
+    def test_chart_type_is_read_from_the_value(self):
+        assert self.chart.chart_type is ChartType.LINE
+
+    def test_non_basic_chart_cannot_be_updated(self):
+        chart = Chart(self.worksheet, json_obj={'chartId': 8, 'spec': {'title': 'Pie', 'pieChart': {}}})
+        assert chart.chart_type is None
+        with pytest.raises(InvalidArgumentValue):
+            chart.domain = ('A1', 'A7')
+        assert chart.domain == ()
+        chart.title = 'new'
+        with pytest.raises(InvalidArgumentValue):
+            chart.flush()
+        assert not self.batch_update.called
+
+        chart.chart_type = ChartType.COLUMN
+        assert self.sent_requests()[0]['updateChartSpec']['spec']['basicChart']['chartType'] == 'COLUMN'
+
+    def test_delete_in_batch_drops_pending_updates(self):
+        with self.chart.batch():
+            self.chart.title = 'x'
+            self.chart.anchor_cell = 'H2'
+            self.chart.delete()
+        assert self.sent_requests() == [{'deleteEmbeddedObject': {'objectId': 7}}]
+
+    def test_refresh_sends_pending_changes(self):
+        chart_json = dict(CHART_JSON, spec=dict(CHART_JSON['spec'], title='x'))
+        self.worksheet.client.sheet.get.return_value = {
+            'sheets': [{'properties': {'sheetId': 0}, 'charts': [chart_json]}]}
+        self.chart.title = 'x'
+        self.chart.refresh()
+        assert self.sent_requests()[0]['updateChartSpec']['spec']['title'] == 'x'
+        assert self.chart.title == 'x'
+
+    def test_refresh_in_batch_keeps_pending_changes_queued(self):
+        self.worksheet.client.sheet.get.return_value = {
+            'sheets': [{'properties': {'sheetId': 0}, 'charts': [CHART_JSON]}]}
+        with self.chart.batch():
+            self.chart.title = 'x'
+            self.chart.refresh()
+            assert not self.batch_update.called
+        assert [request['updateChartSpec']['spec']['title'] for request in self.sent_requests()] == ['x']
+
+    def test_refresh_max_age(self):
+        get = self.set_sheet_charts(CHART_JSON)
+        self.chart.refresh()
+        self.chart.refresh()
+        assert get.call_count == 1
+        self.chart.refresh(max_age=0)
+        assert get.call_count == 2
+
+    def test_back_to_back_refreshes_share_one_fetch(self):
+        other = Chart(self.worksheet, json_obj=titled(CHART_JSON, 'Other', chartId=8))
+        get = self.set_sheet_charts(titled(CHART_JSON, 'A'), titled(CHART_JSON, 'B', chartId=8))
+        self.chart.refresh()
+        other.refresh()
+        assert get.call_count == 1
+        assert (self.chart.title, other.title) == ('A', 'B')
+
+    def test_chart_update_invalidates_the_fetch(self):
+        get = self.set_sheet_charts(CHART_JSON)
+        self.chart.refresh()
+        self.chart.legend_position = 'LEFT_LEGEND'
+        self.chart.flush()
+        self.chart.refresh()
+        assert get.call_count == 2
+
+    def test_expired_fetch_is_not_reused(self):
+        get = self.set_sheet_charts(CHART_JSON)
+        with mock.patch('pygsheets.chart.time.monotonic', return_value=100.0):
+            self.chart.refresh()
+            self.chart.refresh()
+        assert get.call_count == 1
+        with mock.patch('pygsheets.chart.time.monotonic', return_value=100.0 + Chart.refresh_ttl):
+            self.chart.refresh()
+        assert get.call_count == 2
+
+    def test_refresh_finds_the_chart_by_sheet_and_id(self):
+        self.set_sheet_charts(titled(CHART_JSON, 'Sibling', chartId=8), titled(CHART_JSON, 'Mine'),
+                              s1=[titled(CHART_JSON, 'Other sheet')])
+        self.chart.refresh()
+        assert self.chart.title == 'Mine'
+        assert self.sent_requests() == []
+
+        self.set_sheet_charts(titled(CHART_JSON, 'Sibling', chartId=8))
+        self.chart.refresh(max_age=0)
+        assert self.chart.title == 'Mine'
+
+    def test_refresh_requests_the_fields_set_json_reads(self):
+        get = self.set_sheet_charts(CHART_JSON)
+        self.chart.refresh()
+        fields = get.call_args.kwargs['fields']
+        for field in ('properties/sheetId', 'chartId', 'position/overlayPosition/anchorCell', 'spec(title,',
+                      'titleTextFormat/fontFamily', 'chartType', 'legendPosition',
+                      'domains/domain/sourceRange/sources', 'series/series/sourceRange/sources'):
+            assert field in fields
+        assert fields.count('(') == fields.count(')')
+        assert (self.chart.anchor_cell, self.chart.domain, self.chart.ranges) == ((1, 4), [(1, 1), (6, 1)], [[(1, 2), (6, 2)]])
+        assert self.sent_requests() == []
+
+    def test_unchanged_anchor_is_not_sent(self):
+        self.chart.anchor_cell = 'D1'
+        self.chart.anchor_cell = (1, 4)
+        assert self.sent_requests() == []
+
+        self.chart.anchor_cell = 'E1'
+        assert self.sent_requests()[0]['updateEmbeddedObjectPosition']['newPosition'] == \
+            {'overlayPosition': {'anchorCell': {'columnIndex': 4, 'rowIndex': 0, 'sheetId': 0}}}
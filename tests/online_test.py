@@ -743,6 +743,7 @@ class TestWorkSheet(object):
         obj2[0].anchor_cell = (12,7)
         obj2[0].ranges = [[(30,2),(33,2)]]
         obj2[0].legend_position = "LEFT_LEGEND"
+        obj2[0].flush()
         obj.refresh()
         assert obj.legend_position == "LEFT_LEGEND"
         assert obj.title == "Test_changed"
@@ -752,6 +753,23 @@ class TestWorkSheet(object):
         obj.delete()
         self.worksheet.clear()
 
+    def test_chart_batch(self):
+        self.worksheet.resize(50,50)
+        self.worksheet.update_values('A30:C33',[['x','y','z'],[1,5,9],[2,4,8],[3,6,10]])
+        dmn = [(30,1),(33,1)]
+        rng = [[(30,2),(33,2)],[(30,3),(33,3)]]
+        obj = self.worksheet.add_chart(dmn, rng, "Test3", pygsheets.ChartType.COLUMN, "A16")
+        with obj.batch():
+            obj.title = "Test3_changed"
+            obj.legend_position = "LEFT_LEGEND"
+            obj.anchor_cell = (12,7)
+        obj2 = self.worksheet.get_charts("Test3_changed")
+        assert len(obj2) == 1
+        assert obj2[0].legend_position == "LEFT_LEGEND"
+        assert obj2[0].anchor_cell == (12,7)
+        obj.delete()
+        self.worksheet.clear()
+
     def test_set_basic_filter(self):
         self.worksheet.resize(50, 50)
         self.worksheet.update_values('A1:C5', [
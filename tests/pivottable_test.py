@@ -0,0 +1,184 @@
+"""Tests of the pivot table classes, which build their json without the Google API."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pygsheets.cell import Cell
+from pygsheets.custom_types import PivotValueLayout, SortOrder
+from pygsheets.exceptions import InvalidArgumentValue
+from pygsheets.pivottable import (ManualRule, PivotFilterCriteria, PivotFilterSpec, PivotGroup, PivotGroupLimit,
+                                  PivotTable, PivotValue, PivotValueSummarizeFunction)
+
+
+def make_group(**kwargs):
+    kwargs.setdefault('label', 'Region')
+    kwargs.setdefault('source', ('A1', 'A10'))
+    kwargs.setdefault('column_offset', 1)
+    kwargs.setdefault('group_rule', ManualRule({}))
+    return PivotGroup(**kwargs)
+
+
+def make_filter_spec(column_offset_index=2):
+    return PivotFilterSpec(PivotFilterCriteria(['east'], None, False), column_offset_index=column_offset_index)
+
+
+def make_value():
+    return PivotValue(PivotValueSummarizeFunction.SUM, 'Total', None, 3, None, None)
+
+
+def assert_no_callables(json_obj):
+    assert not callable(json_obj)
+    children = json_obj.values() if isinstance(json_obj, dict) else json_obj if isinstance(json_obj, list) else ()
+    for child in children:
+        assert_no_callables(child)
+
+
+class TestPivotGroup(object):
+    def test_source_is_converted_to_tuples(self):
+        assert make_group().source == ((1, 1), (10, 1))
+
+    def test_to_json_is_reused_until_changed(self):
+        group = make_group()
+        group_json = group.to_json()
+        assert group.to_json() is group_json
+        assert group.json_obj is group_json
+
+        group.label = 'Country'
+        assert group.to_json() is not group_json
+        assert group.to_json()['label'] == 'Country'
+
+    def test_setters_change_the_json(self):
+        group = make_group()
+        group.show_totals = False
+        group.sort_order = SortOrder.DESCENDING
+        group.group_limit = PivotGroupLimit(3, 1)
+        group_json = group.to_json()
+        assert group_json['showTotals'] is False
+        assert group_json['sortOrder'] == 'DESCENDING'
+        assert group_json['groupLimit'] == {'countLimit': 3, 'applyOrder': 1}
+        assert group.group_limit.get_json() == group_json['groupLimit']
+
+    def test_setters_take_the_place_of_set_json_values(self):
+        group = make_group()
+        source_json = {'label': 'fromjson', 'showTotals': False}
+        group.set_json(source_json)
+        assert group.to_json()['label'] == 'fromjson'
+
+        group.label = 'x'
+        assert group.to_json()['label'] == 'x'
+        assert group.to_json()['showTotals'] is False
+        assert source_json == {'label': 'fromjson', 'showTotals': False}
+
+    def test_zero_column_offset_is_kept(self):
+        assert make_group(column_offset=0).to_json()['sourceColumnOffset'] == 0
+        group = make_group(column_offset=None, json_obj={'sourceColumnOffset': 0})
+        assert group.to_json()['sourceColumnOffset'] == 0
+        assert 'sourceColumnOffset' not in make_group(column_offset=None).to_json()
+
+        assert make_filter_spec(column_offset_index=0).get_json()['columnOffsetIndex'] == 0
+
+    def test_data_source_column_reference_is_copied(self):
+        reference = {'name': 'region'}
+        group = make_group(column_offset=None, json_obj={'dataSourceColumnReference': reference})
+        assert group.to_json()['dataSourceColumnReference'] == reference
+
+
+class TestPivotTable(object):
+    def test_defaults_are_built_as_json(self):
+        table = PivotTable(data_source_id='ds', rows=[make_group()], values=[make_value()],
+                           filter_specs=[make_filter_spec()])
+        table_json = table.to_json()
+        assert_no_callables(table_json)
+        assert table_json['values'][0]['summarizeFunction'] == 'SUM'
+        assert table_json['filterSpecs'][0]['filterCriteria']['visibleValues'] == ['east']
+        assert table_json['valueLayout'] == 'HORIZONTAL'
+        assert 'groupLimit' not in table_json['rows'][0]
+
+    def test_properties_return_their_values(self):
+        filter_specs = [make_filter_spec()]
+        table = PivotTable(data_source_id='ds', filter_specs=filter_specs)
+        assert table.filter_specs is filter_specs
+        assert table.json_obj['filterSpecs'] == [filter_specs[0].get_json()]
+        assert make_group().json_obj['label'] == 'Region'
+
+    def test_group_changes_reach_the_table_json(self):
+        group = make_group()
+        table = PivotTable(data_source_id='ds', rows=[group], columns=[make_group(label='Year')])
+        assert table.to_json()['rows'][0]['label'] == 'Region'
+
+        group.label = 'changed'
+        table.columns[0].show_totals = False
+        assert table.to_json()['rows'][0]['label'] == 'changed'
+        assert table.json_obj['columns'][0]['showTotals'] is False
+
+    def test_json_rows_replace_the_groups(self):
+        table = PivotTable(data_source_id='ds', rows=[make_group()])
+        table.set_json({'rows': [{'label': 'fromjson'}]})
+        assert table.rows == ()
+        assert table.to_json()['rows'] == [{'label': 'fromjson'}]
+
+    def test_cell_keeps_a_copy_of_the_table_json(self):
+        table = PivotTable(data_source_id='ds', rows=[make_group()])
+        cell = Cell('A1')
+        cell.pivot_table = table
+        table.rows = []
+        assert cell.pivot_table.json_obj['rows'][0]['label'] == 'Region'
+
+        cell.pivot_table = None
+        assert cell.pivot_table is None
+
+    def test_source_setters_change_the_json(self):
+        table = PivotTable(source={'sheetId': 0, 'endRowIndex': 5})
+        table.source = {'sheetId': 1, 'endRowIndex': 9}
+        assert table.to_json()['source'] == {'sheetId': 1, 'endRowIndex': 9}
+
+        with pytest.raises(InvalidArgumentValue):
+            table.data_source_id = 'ds'
+        assert table.data_source_id is None
+        assert 'dataSourceId' not in table.to_json()
+
+        table.source = None
+        table.data_source_id = 'ds'
+        assert 'source' not in table.to_json()
+        assert table.to_json()['dataSourceId'] == 'ds'
+        with pytest.raises(InvalidArgumentValue):
+            table.source = {'sheetId': 1}
+
+    def test_from_json(self):
+        table_json = {'dataSourceId': 'ds', 'valueLayout': 'VERTICAL', 'rows': [{'label': 'Region'}]}
+        table = PivotTable.from_json(None, table_json)
+        assert isinstance(table, PivotTable)
+        assert table.data_source_id == 'ds'
+        assert table.source is None
+        assert table.layout is PivotValueLayout.VERTICAL
+        assert table.to_json() == table_json
+        assert table.to_json() is not table_json
+
+    def test_cell_pivot_table_from_cell_data(self):
+        assert Cell('A1', cell_data={}).pivot_table is None
+        cell = Cell('A1', cell_data={'pivotTable': {'dataSourceId': 'ds'}})
+        assert cell.pivot_table.data_source_id == 'ds'
+        assert cell.pivot_table.layout is PivotValueLayout.HORIZONTAL
+
+    def test_single_source_tables(self):
+        assert PivotTable(data_source_id='ds').to_json()['dataSourceId'] == 'ds'
+        assert 'source' not in PivotTable(data_source_id='ds').to_json()
+
+        source_json = {'sheetId': 0, 'startRowIndex': 0, 'endRowIndex': 5}
+        table = PivotTable(source=source_json)
+        assert table.to_json()['source'] == source_json
+        assert 'dataSourceId' not in table.to_json()
+
+        table = PivotTable(data_source_id='ds', json_obj={'dataSourceId': 'other'})
+        assert table.to_json()['dataSourceId'] == 'other'
+
+    def test_source_and_data_source_are_exclusive(self):
+        with pytest.raises(InvalidArgumentValue):
+            PivotTable()
+        with pytest.raises(InvalidArgumentValue):
+            PivotTable(source={'sheetId': 0}, data_source_id='ds')
+        with pytest.raises(InvalidArgumentValue):
+            PivotTable(data_source_id='ds', json_obj={'source': {'sheetId': 0}})
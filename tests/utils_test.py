@@ -0,0 +1,55 @@
+"""Tests of the helpers in pygsheets.utils which do not need the Google API."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pygsheets.exceptions import IncorrectCellLabel, InvalidArgumentValue
+from pygsheets.utils import format_addr
+
+
+class TestFormatAddr(object):
+    def test_label_to_tuple(self):
+        assert format_addr('A1', 'tuple') == (1, 1)
+        assert format_addr('ab12', 'tuple') == (12, 28)
+        assert format_addr('ZZ3') == (3, 702)
+
+    def test_tuple_to_label(self):
+        assert format_addr((1, 1), 'label') == 'A1'
+        assert format_addr((12, 28)) == 'AB12'
+        assert format_addr((None, 3), 'label') == 'C'
+        assert format_addr((4, None), 'label') == '4'
+
+    def test_same_format_is_returned_as_is(self):
+        addr = (3, 4)
+        assert format_addr(addr, 'tuple') is addr
+        assert format_addr('C4', 'label') == 'C4'
+
+    def test_repeated_conversions_agree(self):
+        for _ in range(2):
+            assert format_addr('B2', 'tuple') == (2, 2)
+            assert format_addr((2, 2), 'label') == 'B2'
+            assert format_addr((2, 3), 'label') == 'C2'
+
+    def test_unhashable_address(self):
+        with pytest.raises(InvalidArgumentValue):
+            format_addr([1, 1], 'label')
+        with pytest.raises(InvalidArgumentValue):
+            format_addr({'row': 1}, 'tuple')
+
+    def test_invalid_address(self):
+        with pytest.raises(IncorrectCellLabel):
+            format_addr('11', 'tuple')
+        with pytest.raises(IncorrectCellLabel):
+            format_addr((0, 1), 'label')
+        with pytest.raises(IncorrectCellLabel):
+            format_addr((1, -2), 'label')
+        with pytest.raises(InvalidArgumentValue):
+            format_addr(5, 'tuple')
+
+    def test_errors_are_not_cached(self):
+        for _ in range(2):
+            with pytest.raises(IncorrectCellLabel):
+                format_addr('1A', 'tuple')